@@ -126,14 +126,15 @@ def main():
     # Get dependency list and resolve package name
     print(f"Resolving package name for: {module_or_package}", file=sys.stderr)
     dependencies = get_all_dependencies(xcodeproj_path)
-    package_name = resolve_module_to_package(module_or_package, dependencies)
+    package_identity = resolve_module_to_package(module_or_package, dependencies)
 
-    if package_name is None:
+    if package_identity is None:
         error_exit(f"Could not find package for module: {module_or_package}")
 
     # Get package info
-    package_info = dependencies[package_name]
-    version = package_info.get("version", "unknown")
+    package_info = dependencies[package_identity]
+    package_name = package_info.name
+    version = package_info.version
 
     # Parse version to major.minor
     version_parts = version.split('.')
@@ -152,7 +153,7 @@ def main():
     print(f"Finding package '{package_name}' in DerivedData...", file=sys.stderr)
     project_name = xcodeproj_path.stem
     checkouts_dir = find_derived_data_path(project_name)
-    package_dir = find_package_directory_in_derived_data(checkouts_dir, package_name)
+    package_dir = find_package_directory_in_derived_data(checkouts_dir, package_identity)
 
     if package_dir is None:
         error_exit(f"Package '{package_name}' not found in DerivedData. Has the project been built?")
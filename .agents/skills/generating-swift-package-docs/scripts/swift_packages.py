@@ -6,32 +6,131 @@ and extracting package metadata.
 """
 
 import sys
+import os
 import json
 import re
+import functools
+import collections
+import contextlib
+import mmap
+import hashlib
+import tempfile
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+# Try to use orjson for faster JSON parsing, but make it optional
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Try to import ijson for streaming large Package.resolved files, but make it optional
+try:
+    import ijson
+
+    # items(..., use_float=True) needs ijson 3.1+
+    _HAS_IJSON = tuple(
+        int(part) for part in ijson.__version__.split(".")[:2] if part.isdigit()
+    ) >= (3, 1)
+except (ImportError, AttributeError):
+    _HAS_IJSON = False
+
+# Package.resolved files larger than this are streamed with ijson when available
+_STREAM_THRESHOLD = 256 * 1024
+
+# Parsed Package.resolved / Package.swift results, reused across runs.
+# Bump _CACHE_VERSION whenever parsing can produce different output.
+_cache_dir = Path.home() / ".cache" / "voiceflow-swift-pkgs"
+_CACHE_VERSION = 2
+
+# Below this many unparsed dependencies, thread pool overhead isn't worth it
+_MIN_PARALLEL_LOADS = 4
+
+# Shared default for pins without a "state" entry; never mutated
+_EMPTY: Dict = {}
+
+PackageInfo = collections.namedtuple("PackageInfo", "name url version")
+
+# Patterns run over the raw Package.swift bytes; only captured names are decoded
+# Match Package(name: "PackageName", ...); [^)] already spans newlines, and the
+# bounded repeat caps backtracking on Package( calls that never reach name:
+_PKG_NAME_RE = re.compile(rb'Package\s*\([^)]{0,4000}?name\s*:\s*"([^"]+)"')
+# .target(name: "TargetName", ...) or .executableTarget(name: "TargetName", ...)
+_TARGETS_RE = re.compile(rb'\.(?:executableTarget|target)\s*\(\s*name\s*:\s*"([^"]+)"')
+
+
+def _cached(path: Path, compute: Callable[[Path], Any]) -> Any:
+    """
+    Return compute(path), reusing the result cached on disk by a previous run
+    while the file's mtime and size are unchanged.
+
+    compute must return JSON-serializable data; None results are not cached.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return compute(path)
+
+    # Key on the absolute path so projects opened via relative paths don't collide
+    abs_path = str(path.resolve())
+    stamp = [_CACHE_VERSION, abs_path, st.st_mtime_ns, st.st_size]
+    cache_file = _cache_dir / f"{hashlib.sha1(abs_path.encode()).hexdigest()}.json"
+
+    try:
+        with open(cache_file, "rb") as f:
+            cached = _loads(f.read())
+        if cached["stamp"] == stamp:
+            return cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    data = compute(path)
+    if data is None:
+        return data
+
+    # Write atomically so concurrent runs never see a partial cache file
+    tmp_path = None
+    try:
+        _cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=_cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"stamp": stamp, "data": data}, f)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return data
 
 
 def find_package_resolved(xcodeproj_path: Path) -> Path:
     """Find the Package.resolved file in the Xcode project."""
-    possible_locations = [
+    # Most common location first, so the fallback path is only built if needed
+    location = (
         xcodeproj_path
         / "project.xcworkspace"
         / "xcshareddata"
         / "swiftpm"
-        / "Package.resolved",
+        / "Package.resolved"
+    )
+    if location.exists():
+        return location
+
+    location = (
         xcodeproj_path.parent
         / ".swiftpm"
         / "xcode"
         / "package.xcworkspace"
         / "xcshareddata"
         / "swiftpm"
-        / "Package.resolved",
-    ]
-
-    for location in possible_locations:
-        if location.exists():
-            return location
+        / "Package.resolved"
+    )
+    if location.exists():
+        return location
 
     raise FileNotFoundError("Could not find Package.resolved file")
 
@@ -48,17 +147,22 @@ def find_derived_data_path(project_name: str) -> Path:
     # Xcode replaces spaces with underscores in DerivedData directory names
     normalized_project_name = project_name.replace(" ", "_")
 
-    # Find directories matching the project name
-    pattern = f"{normalized_project_name}-*"
-    matching_dirs = list(derived_data_base.glob(pattern))
+    # Find directories matching the project name; only matches pay for a stat
+    prefix = normalized_project_name + "-"
+    with os.scandir(derived_data_base) as entries:
+        matching_dirs = [
+            entry
+            for entry in entries
+            if entry.name.startswith(prefix) and entry.is_dir(follow_symlinks=False)
+        ]
 
     if not matching_dirs:
         raise FileNotFoundError(
             f"No DerivedData directory found for project '{project_name}'"
         )
 
-    # Use the most recently modified one
-    derived_data_dir = max(matching_dirs, key=lambda p: p.stat().st_mtime)
+    # Use the most recently modified one (DirEntry caches its stat result)
+    derived_data_dir = Path(max(matching_dirs, key=lambda e: e.stat().st_mtime_ns).path)
 
     source_packages = derived_data_dir / "SourcePackages" / "checkouts"
 
@@ -72,8 +176,19 @@ def find_derived_data_path(project_name: str) -> Path:
 
 def parse_package_resolved(resolved_path: Path) -> List[Dict]:
     """Parse Package.resolved to get list of dependencies."""
-    with open(resolved_path, "r") as f:
-        data = json.load(f)
+    return _cached(resolved_path, _parse_package_resolved)
+
+
+def _parse_package_resolved(resolved_path: Path) -> List[Dict]:
+    with open(resolved_path, "rb") as f:
+        if _HAS_IJSON and os.fstat(f.fileno()).st_size > _STREAM_THRESHOLD:
+            pins = _stream_pins(f)
+            if pins:
+                return pins
+            # No pins found; let the full parse below report the format
+            f.seek(0)
+
+        data = _loads(f.read())
 
     # Handle different Package.resolved formats (version 2 and 3)
     if "pins" in data:
@@ -84,47 +199,62 @@ def parse_package_resolved(resolved_path: Path) -> List[Dict]:
         raise ValueError("Unknown Package.resolved format")
 
 
-def extract_package_info(pin: Dict) -> Dict:
+def _stream_pins(f) -> List[Dict]:
+    """Stream only the pins array out of Package.resolved, skipping everything else."""
+    # Version 2 and 3 keep pins at the top level, version 1 under "object"
+    for prefix in ("pins.item", "object.pins.item"):
+        f.seek(0)
+        pins = list(ijson.items(f, prefix, use_float=True))
+        if pins:
+            return pins
+    return []
+
+
+def extract_package_info(pin: Dict) -> PackageInfo:
     """Extract package name and repository URL from a pin entry."""
     # Handle both v2 and v3 formats
-    if "package" in pin:
-        name = pin["package"]
-    elif "identity" in pin:
-        name = pin["identity"]
-    else:
-        name = "Unknown"
+    name = pin.get("package") or pin.get("identity") or "Unknown"
+    url = pin.get("repositoryURL") or pin.get("location")
 
-    if "repositoryURL" in pin:
-        url = pin["repositoryURL"]
-    elif "location" in pin:
-        url = pin["location"]
-    else:
-        url = None
+    state = pin.get("state", _EMPTY)
+    version = state.get("version") or state.get("revision", "unknown")
+
+    return PackageInfo(name, url, version)
 
-    version = pin.get("state", {}).get("version") or pin.get("state", {}).get(
-        "revision", "unknown"
-    )
 
-    return {"name": name, "url": url, "version": version}
+@functools.lru_cache(maxsize=None)
+def _index_checkouts(checkouts_dir: Path) -> Dict[str, str]:
+    """
+    Map lowercased directory names in checkouts to their paths.
+
+    Scanned once and reused until get_all_dependencies sees a new or changed
+    Package.resolved, which clears this cache.
+    """
+    index = {}
+    with os.scandir(checkouts_dir) as entries:
+        for entry in entries:
+            # DirEntry.is_dir uses the cached d_type, avoiding a stat per entry
+            if entry.is_dir(follow_symlinks=False):
+                index[entry.name.lower()] = entry.path
+    return index
 
 
 def find_package_swift_in_derived_data(
     checkouts_dir: Path, package_identity: str
 ) -> Optional[Path]:
     """Find Package.swift for a given package in DerivedData checkouts."""
+    # Called once per pin: join plain strings and only build a Path on success
     # Try exact match first
-    package_dir = checkouts_dir / package_identity
-    if package_dir.exists():
-        package_swift = package_dir / "Package.swift"
-        if package_swift.exists():
-            return package_swift
-
-    # Try case-insensitive search
-    for subdir in checkouts_dir.iterdir():
-        if subdir.is_dir() and subdir.name.lower() == package_identity.lower():
-            package_swift = subdir / "Package.swift"
-            if package_swift.exists():
-                return package_swift
+    package_swift = os.path.join(checkouts_dir, package_identity, "Package.swift")
+    if os.path.isfile(package_swift):
+        return Path(package_swift)
+
+    # Try case-insensitive lookup
+    package_dir = _index_checkouts(checkouts_dir).get(package_identity.lower())
+    if package_dir:
+        package_swift = os.path.join(package_dir, "Package.swift")
+        if os.path.isfile(package_swift):
+            return Path(package_swift)
 
     return None
 
@@ -134,79 +264,260 @@ def find_package_directory_in_derived_data(
 ) -> Optional[Path]:
     """Find package directory in DerivedData checkouts."""
     # Try exact match first
-    package_dir = checkouts_dir / package_identity
-    if package_dir.exists():
-        return package_dir
+    package_dir = os.path.join(checkouts_dir, package_identity)
+    if os.path.exists(package_dir):
+        return Path(package_dir)
 
-    # Try case-insensitive search
-    for subdir in checkouts_dir.iterdir():
-        if subdir.is_dir() and subdir.name.lower() == package_identity.lower():
-            return subdir
+    # Try case-insensitive lookup
+    package_dir = _index_checkouts(checkouts_dir).get(package_identity.lower())
+    return Path(package_dir) if package_dir else None
 
-    return None
 
+@contextlib.contextmanager
+def map_package_swift(package_swift_path: Path) -> Iterator[bytes]:
+    """
+    Memory-map Package.swift for the duration of the with block.
 
-def read_package_swift(package_swift_path: Path, verbose: bool = False) -> Optional[str]:
-    """Read Package.swift content from local file."""
-    try:
-        with open(package_swift_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception as e:
-        if verbose:
-            print(f"Warning: Could not read {package_swift_path}: {e}", file=sys.stderr)
-        return None
+    Yields a read-only bytes-like buffer. Raises OSError if the file can't be read.
+    """
+    with open(package_swift_path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files can't be mapped (and some filesystems don't support it)
+            buf = None
 
+        if buf is None:
+            yield f.read()
+            return
+
+        with buf:
+            yield buf
 
-def parse_package_name_from_package_swift(content: str) -> Optional[str]:
-    """Extract the actual package name from Package.swift content."""
-    if not content:
-        return None
 
-    # Match Package(name: "PackageName", ...) with DOTALL to handle multi-line
-    package_name_pattern = r'Package\s*\([^)]*?name\s*:\s*"([^"]+)"'
-    match = re.search(package_name_pattern, content, re.DOTALL)
+def parse_package_name_from_package_swift(content: bytes) -> Optional[str]:
+    """Extract the actual package name from Package.swift content."""
+    match = _PKG_NAME_RE.search(content)
 
     if match:
-        return match.group(1)
+        return match.group(1).decode("utf-8", "replace")
 
     return None
 
 
-def parse_targets_from_package_swift(content: str) -> List[str]:
+def parse_targets_from_package_swift(content: bytes) -> List[str]:
     """Extract target names from Package.swift content."""
-    if not content:
-        return []
+    # .testTarget patterns are intentionally not matched
+    return [
+        target.decode("utf-8", "replace") for target in _TARGETS_RE.findall(content)
+    ]
+
+
+def _parse_package_swift(package_swift_path: Path) -> Dict:
+    """Parse {"name", "targets"} from Package.swift; raises OSError if unreadable."""
+    with map_package_swift(package_swift_path) as package_swift_content:
+        return {
+            "name": parse_package_name_from_package_swift(package_swift_content),
+            "targets": parse_targets_from_package_swift(package_swift_content),
+        }
+
+
+class Dependency(Mapping):
+    """
+    Metadata for one pinned dependency.
+
+    Package.swift is only located, read and parsed the first time `name` or
+    `exported_modules` is accessed. Behaves as a read-only mapping over the
+    "name", "version", "repo" and "exported_modules" keys. It is not a dict;
+    _asdict() returns a plain, JSON-serializable dict.
+    """
+
+    __slots__ = (
+        "identity",
+        "version",
+        "repo",
+        "_checkouts_dir",
+        "_verbose",
+        "_name",
+        "_exported_modules",
+    )
+
+    _FIELDS = ("name", "version", "repo", "exported_modules")
+
+    def __init__(
+        self, pkg_info: PackageInfo, checkouts_dir: Optional[Path], verbose: bool = False
+    ):
+        self.identity = pkg_info.name
+        self.version = pkg_info.version
+        self.repo = pkg_info.url or None
+        self._checkouts_dir = checkouts_dir
+        self._verbose = verbose
+        self._name: Optional[str] = None
+        self._exported_modules: Optional[FrozenSet[str]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._exported_modules is not None
+
+    def load(self) -> None:
+        """Parse the package name and targets from Package.swift in DerivedData."""
+        log = self._load()
+        if log:
+            sys.stderr.write("".join(log))
+
+    def _load(self) -> List[str]:
+        """Like load(), but return the verbose log lines instead of printing them."""
+        if self.loaded:
+            return []
+        log: List[str] = []
+        parsed_name, targets = self._parse_package_swift(log)
+        self._name = parsed_name or self.identity
+        self._exported_modules = frozenset(targets)
+        return log
+
+    def _parse_package_swift(self, log: List[str]) -> Tuple[Optional[str], List[str]]:
+        verbose = self._verbose
+        if verbose:
+            log.append(f"Processing {self.identity}...\n")
+
+        if not self._checkouts_dir:
+            return None, []
+
+        package_swift_path = find_package_swift_in_derived_data(
+            self._checkouts_dir, self.identity
+        )
+        if not package_swift_path:
+            if verbose:
+                log.append(f"  Package.swift not found in checkouts\n")
+            return None, []
+
+        if verbose:
+            log.append(f"  Found Package.swift at: {package_swift_path}\n")
+        try:
+            parsed = _cached(package_swift_path, _parse_package_swift)
+        except OSError as e:
+            if verbose:
+                log.append(f"Warning: Could not read {package_swift_path}: {e}\n")
+            return None, []
+
+        if parsed["name"] and verbose:
+            log.append(f"  Package name: {parsed['name']}\n")
+
+        return parsed["name"], parsed["targets"]
+
+    @property
+    def name(self) -> str:
+        """Package name from Package.swift, falling back to the pin identity."""
+        self.load()
+        return self._name
+
+    @property
+    def exported_modules(self) -> FrozenSet[str]:
+        self.load()
+        return self._exported_modules
+
+    def _asdict(self) -> Dict:
+        """Return a plain dict, with exported_modules as a sorted list."""
+        return {
+            "name": self.name,
+            "version": self.version,
+            "repo": self.repo,
+            "exported_modules": sorted(self.exported_modules),
+        }
+
+    def __getitem__(self, key: str):
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
 
-    targets = []
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
 
-    # Match .target patterns
-    # .target(name: "TargetName", ...)
-    target_pattern = r'\.target\s*\(\s*name\s*:\s*"([^"]+)"'
-    targets.extend(re.findall(target_pattern, content))
+    def __len__(self) -> int:
+        return len(self._FIELDS)
 
-    # Also match .executableTarget patterns
-    executable_target_pattern = r'\.executableTarget\s*\(\s*name\s*:\s*"([^"]+)"'
-    targets.extend(re.findall(executable_target_pattern, content))
+    def __repr__(self) -> str:
+        return (
+            f"Dependency(identity={self.identity!r}, "
+            f"version={self.version!r}, repo={self.repo!r})"
+        )
 
-    # Match .testTarget patterns (optional, but sometimes useful)
-    # test_target_pattern = r'\.testTarget\s*\(\s*name\s*:\s*"([^"]+)"'
-    # targets.extend(re.findall(test_target_pattern, content))
 
-    return targets
+class Dependencies(dict):
+    """
+    Mapping of pin identity to Dependency, as returned by get_all_dependencies().
 
+    module_index maps every exported module and package name to the identity
+    of the dependency providing it. It is built on first use, which parses
+    all Package.swift files, and is not updated if the mapping is modified.
+    """
 
-def get_all_dependencies(xcodeproj_path: Path, verbose: bool = False) -> Dict[str, Dict]:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._module_index: Optional[Dict[str, str]] = None
+
+    def load_all(self) -> None:
+        """Parse all Package.swift files, using a thread pool for larger projects."""
+        pending = [dependency for dependency in self.values() if not dependency.loaded]
+        if len(pending) < _MIN_PARALLEL_LOADS:
+            for dependency in pending:
+                dependency.load()
+            return
+
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(pending))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            logs = list(executor.map(Dependency._load, pending))
+
+        # Print verbose output after the workers finish so it stays in pin order
+        for log in logs:
+            if log:
+                sys.stderr.write("".join(log))
+
+    @property
+    def module_index(self) -> Dict[str, str]:
+        if self._module_index is None:
+            self.load_all()
+            # Package names take precedence over module names; within each,
+            # the first dependency in pin order wins
+            index: Dict[str, str] = {}
+            for identity, dependency in self.items():
+                index.setdefault(dependency.name, identity)
+            for identity, dependency in self.items():
+                for module in dependency.exported_modules:
+                    index.setdefault(module, identity)
+            self._module_index = index
+        return self._module_index
+
+
+# get_all_dependencies results keyed by
+# (Package.resolved path, mtime_ns, need_modules, verbose)
+_deps_cache: Dict[Tuple[str, int, bool, bool], Dependencies] = {}
+
+
+def get_all_dependencies(
+    xcodeproj_path: Path, verbose: bool = False, need_modules: bool = True
+) -> Dependencies:
     """
     Get all dependencies with their metadata for a given Xcode project.
 
-    Returns a dictionary mapping package names to their metadata:
+    Returns a Dependencies dictionary mapping package identities (as pinned in
+    Package.resolved) to lazily-parsed metadata, usable like:
     {
-        "PackageName": {
+        "packageidentity": {
+            "name": "PackageName",
             "version": "1.2.3",
             "repo": "https://github.com/...",
-            "exported_modules": ["Module1", "Module2"]
+            "exported_modules": frozenset({"Module1", "Module2"})
         }
     }
+
+    Package.swift files are only read when "name" or "exported_modules"
+    is accessed for that dependency. With need_modules=False, DerivedData is
+    never searched: every "name" is the pin identity and "exported_modules"
+    is empty.
+
+    Results are memoized per process until Package.resolved changes, so
+    callers share the returned Dependencies and must not modify it.
     """
     # Extract project name from .xcodeproj
     project_name = xcodeproj_path.stem
@@ -216,90 +527,61 @@ def get_all_dependencies(xcodeproj_path: Path, verbose: bool = False) -> Dict[st
     if verbose:
         print(f"Found Package.resolved at: {resolved_path}", file=sys.stderr)
 
+    # Dependencies keep the verbose flag they were built with, so it's part of the key
+    cache_key = (
+        str(resolved_path),
+        resolved_path.stat().st_mtime_ns,
+        need_modules,
+        verbose,
+    )
+    if cache_key in _deps_cache:
+        return _deps_cache[cache_key]
+
+    # Checkouts may have changed along with Package.resolved; rescan them
+    _index_checkouts.cache_clear()
+
     pins = parse_package_resolved(resolved_path)
     if verbose:
         print(f"Found {len(pins)} dependencies", file=sys.stderr)
 
     # Find DerivedData checkouts directory
-    try:
-        checkouts_dir = find_derived_data_path(project_name)
-        if verbose:
-            print(f"Found package checkouts at: {checkouts_dir}", file=sys.stderr)
-    except FileNotFoundError as e:
-        if verbose:
-            print(f"Warning: {e}", file=sys.stderr)
-            print("Will not be able to extract module information.", file=sys.stderr)
-        checkouts_dir = None
-
-    dependencies = {}
-
+    checkouts_dir = None
+    if need_modules:
+        try:
+            checkouts_dir = find_derived_data_path(project_name)
+            if verbose:
+                print(f"Found package checkouts at: {checkouts_dir}", file=sys.stderr)
+        except FileNotFoundError as e:
+            if verbose:
+                print(f"Warning: {e}", file=sys.stderr)
+                print("Will not be able to extract module information.", file=sys.stderr)
+
+    entries: List[Tuple[str, Dependency]] = []
     for pin in pins:
         pkg_info = extract_package_info(pin)
-        if verbose:
-            print(f"Processing {pkg_info['name']}...", file=sys.stderr)
-
-        targets = []
-        actual_package_name = pkg_info["name"]  # Default to identity
-
-        # Try to read Package.swift from DerivedData
-        if checkouts_dir:
-            package_swift_path = find_package_swift_in_derived_data(
-                checkouts_dir, pkg_info["name"]
-            )
-            if package_swift_path:
-                if verbose:
-                    print(
-                        f"  Found Package.swift at: {package_swift_path}",
-                        file=sys.stderr,
-                    )
-                package_swift_content = read_package_swift(package_swift_path, verbose)
-
-                # Extract actual package name
-                parsed_name = parse_package_name_from_package_swift(
-                    package_swift_content
-                )
-                if parsed_name:
-                    actual_package_name = parsed_name
-                    if verbose:
-                        print(
-                            f"  Package name: {actual_package_name}",
-                            file=sys.stderr,
-                        )
-
-                targets = parse_targets_from_package_swift(package_swift_content)
-            else:
-                if verbose:
-                    print(f"  Package.swift not found in checkouts", file=sys.stderr)
-
-        dependencies[actual_package_name] = {
-            "version": pkg_info["version"],
-            "repo": pkg_info["url"] if pkg_info["url"] else None,
-            "exported_modules": sorted(targets) if targets else [],
-        }
+        entries.append((pkg_info.name, Dependency(pkg_info, checkouts_dir, verbose)))
+
+    dependencies = Dependencies(entries)
 
+    _deps_cache[cache_key] = dependencies
     return dependencies
 
 
 def resolve_module_to_package(
-    module_or_package: str, dependencies: Dict[str, Dict]
+    module_or_package: str, dependencies: Dependencies
 ) -> Optional[str]:
     """
-    Resolve a module name to its package name using dependency information.
+    Resolve a module or package name to the pin identity of its dependency.
 
     Args:
-        module_or_package: Either a module name or package name
+        module_or_package: A module name, package name or pin identity
         dependencies: Dictionary from get_all_dependencies()
 
     Returns:
-        Package name if found, None otherwise
+        Pin identity (a key into dependencies) if found, None otherwise
     """
-    # Check if it's already a package name
+    # Check if it's already a package identity (no Package.swift reads needed)
     if module_or_package in dependencies:
         return module_or_package
 
-    # Search for module in exported_modules
-    for package_name, info in dependencies.items():
-        if module_or_package in info.get("exported_modules", []):
-            return package_name
-
-    return None
+    return dependencies.module_index.get(module_or_package)